@@ -3,15 +3,51 @@
 
 from __future__ import annotations
 
-import importlib
+import functools
+import importlib.util
 import json
 import os
-import subprocess
+import selectors
+import shutil
+import sys
+import termios
 import time
+import tty
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
 
+_HAS_GAPI = importlib.util.find_spec("googleapiclient") is not None
+
+
+def _utc_timestamp() -> str:
+    """Render the current UTC time in ISO-8601 without datetime allocations."""
+    seconds, rem_ns = divmod(time.time_ns(), 1_000_000_000)
+    tm = time.gmtime(seconds)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+        f".{rem_ns // 1000:06d}+00:00"
+    )
+
+
+@contextmanager
+def _cbreak(fd: int):
+    """Switch the terminal to cbreak mode, restoring cooked mode on exit."""
+    old_attrs = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_admob_client(api_key: str):
+    from googleapiclient.discovery import build
+
+    return build("admob", "v1", developerKey=api_key, cache_discovery=False)
+
 
 @dataclass
 class AppStats:
@@ -37,119 +73,190 @@ class RewardVideoTerminalApp:
         self.watch_seconds = watch_seconds
         self.video_url = video_url
         self.log_file = Path(log_file)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._log_fp = self.log_file.open("a", encoding="utf-8", buffering=8192)
+        self._static_json_suffix = (
+            f', "app_id": {json.dumps(self.app_id, ensure_ascii=False)}'
+            f', "ad_unit_id": {json.dumps(self.ad_unit_id, ensure_ascii=False)}}}\n'
+        )
         self.stats = AppStats()
-
-    def _load_google_build(self):
-        module = importlib.import_module("googleapiclient.discovery")
-        return getattr(module, "build", None)
+        self._notify_send = shutil.which("notify-send")
+        self._xdg_open = shutil.which("xdg-open")
 
     def setup_google_sdk(self) -> None:
         """Initialize Google API client when available."""
-        try:
-            build = self._load_google_build()
-        except ModuleNotFoundError:
-            print("[INFO] google-api-python-client non installé.")
-            return
-
         if not self.api_key:
             print("[INFO] GOOGLE_API_KEY absent -> initialisation API ignorée.")
             return
 
+        if not _HAS_GAPI:
+            print("[INFO] google-api-python-client non installé.")
+            return
+
         try:
-            _ = build("admob", "v1", developerKey=self.api_key, cache_discovery=False)
+            _ = _build_admob_client(self.api_key)
             print("[OK] Client API Google AdMob initialisé.")
         except Exception as err:
             print(f"[WARN] Initialisation API Google impossible: {err}")
 
     def notify(self, message: str) -> None:
         print(f"\n[NOTIFICATION] {message}")
-        try:
-            subprocess.run(["notify-send", "Reward Video", message], check=False)
-        except FileNotFoundError:
-            pass
+        if self._notify_send is None:
+            return
+        os.posix_spawn(self._notify_send, [self._notify_send, "Reward Video", message], os.environ)
+
+    def _prompt_choice(self, prompt: str, choices: dict[str, str]) -> str:
+        if not sys.stdin.isatty():
+            allowed = set(choices) | set(choices.values())
+            while True:
+                user_input = input(prompt).strip().lower()
+                if user_input in allowed:
+                    return choices.get(user_input, user_input)
+                print(f"Valeur invalide. Choix attendus: {', '.join(sorted(allowed))}")
 
-    def _prompt_choice(self, prompt: str, allowed: set[str]) -> str:
-        while True:
-            user_input = input(prompt).strip().lower()
-            if user_input in allowed:
-                return user_input
-            print(f"Valeur invalide. Choix attendus: {', '.join(sorted(allowed))}")
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        with _cbreak(sys.stdin.fileno()):
+            while True:
+                key = sys.stdin.read(1).lower()
+                if key in choices:
+                    print(key)
+                    return choices[key]
 
     def _open_video_if_configured(self) -> None:
         if not self.video_url:
             return
-        try:
-            subprocess.run(["xdg-open", self.video_url], check=False)
-            print(f"[INFO] Vidéo ouverte: {self.video_url}")
-        except FileNotFoundError:
+        if self._xdg_open is None:
             print("[INFO] xdg-open indisponible, ouvrez la vidéo manuellement.")
+            return
+        os.posix_spawn(self._xdg_open, [self._xdg_open, self.video_url], os.environ)
+        print(f"[INFO] Vidéo ouverte: {self.video_url}")
 
     def _log_event(self, cycle: int, action: str) -> None:
-        event = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "cycle": cycle,
-            "action": action,
-            "app_id": self.app_id,
-            "ad_unit_id": self.ad_unit_id,
-        }
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        with self.log_file.open("a", encoding="utf-8") as fp:
-            fp.write(json.dumps(event, ensure_ascii=False) + "\n")
+        if action not in {"share", "reject"}:
+            raise ValueError(f"action inconnue: {action!r}")
+        timestamp = _utc_timestamp()
+        self._log_fp.write(
+            f'{{"timestamp": "{timestamp}", "cycle": {cycle}, "action": "{action}"'
+            + self._static_json_suffix
+        )
+
+    def close(self) -> None:
+        """Flush and close the event log."""
+        if not self._log_fp.closed:
+            self._log_fp.flush()
+            self._log_fp.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _wait_watch_period(self, seconds: int) -> None:
+        """Block until the watch period elapses or the user presses a key to skip."""
+        if not sys.stdin.isatty():
+            time.sleep(seconds)
+            return
+
+        deadline = time.monotonic() + seconds
+        with _cbreak(sys.stdin.fileno()), selectors.DefaultSelector() as sel:
+            sel.register(sys.stdin, selectors.EVENT_READ)
+            while (remaining := deadline - time.monotonic()) > 0:
+                if sel.select(timeout=remaining):
+                    sys.stdin.read(1)
+                    print("  ⏩ Visionnage passé par l'utilisateur.")
+                    return
 
     def play_reward_video(self, cycle: int) -> str:
         self.notify("Lecture d'une vidéo reward.")
         self._open_video_if_configured()
 
-        print(
-            f"Patientez {self.watch_seconds}s pendant le visionnage "
-            "(ou regardez la vidéo depuis l'URL configurée)."
-        )
-        for second in range(1, self.watch_seconds + 1):
-            print(f"  ▶ Vidéo en cours... {second}/{self.watch_seconds}s", end="\r", flush=True)
-            time.sleep(1)
-        print()
+        ws = self.watch_seconds
+        if ws > 0:
+            print(
+                f"Patientez {ws}s pendant le visionnage "
+                "(ou appuyez sur une touche pour passer l'attente)."
+            )
+            self._wait_watch_period(ws)
+            print(f"  ▶ Vidéo en cours... {ws}/{ws}s")
 
-        watched = self._prompt_choice("La vidéo a été regardée entièrement ? (y/n): ", {"y", "n"})
+        watched = self._prompt_choice(
+            "La vidéo a été regardée entièrement ? (y/n): ", {"y": "y", "n": "n"}
+        )
         if watched == "n":
             return "reject"
 
-        return self._prompt_choice("Action utilisateur finale (share/reject): ", {"share", "reject"})
+        return self._prompt_choice(
+            "Action utilisateur finale (s=share / r=reject): ", {"s": "share", "r": "reject"}
+        )
 
     def run(self) -> None:
-        print("=== Reward Video Terminal App (AdMob) ===")
-        print(f"App ID      : {self.app_id or 'NON CONFIGURÉ'}")
-        print(f"Ad Unit ID  : {self.ad_unit_id or 'NON CONFIGURÉ'}")
-        print(f"Event log   : {self.log_file}")
-        print("----------------------------------------")
+        sys.stdout.write(
+            "=== Reward Video Terminal App (AdMob) ===\n"
+            f"App ID      : {self.app_id or 'NON CONFIGURÉ'}\n"
+            f"Ad Unit ID  : {self.ad_unit_id or 'NON CONFIGURÉ'}\n"
+            f"Event log   : {self.log_file}\n"
+            "----------------------------------------\n"
+        )
+        sys.stdout.flush()
+
+        if self.runs <= 0:
+            sys.stdout.write(
+                "\n=== Résultat final ===\n"
+                f"Nombre de share : {self.stats.shares}\n"
+                f"Nombre de reject: {self.stats.rejects}\n"
+            )
+            sys.stdout.flush()
+            return
+
         self.setup_google_sdk()
 
-        for index in range(1, self.runs + 1):
-            print(f"\nCycle {index}/{self.runs}")
+        runs = self.runs
+        stats = self.stats
+        for index in range(1, runs + 1):
+            print(f"\nCycle {index}/{runs}")
             action = self.play_reward_video(index)
             self._log_event(index, action)
 
             if action == "share":
-                self.stats.shares += 1
-                print("✅ SHARE enregistré.")
+                stats.shares += 1
+                result_line = "✅ SHARE enregistré."
             else:
-                self.stats.rejects += 1
-                print("❌ REJECT enregistré.")
+                stats.rejects += 1
+                result_line = "❌ REJECT enregistré."
 
-            print(f"Compteurs => share: {self.stats.shares} | reject: {self.stats.rejects}")
+            sys.stdout.write(
+                f"{result_line}\n"
+                f"Compteurs => share: {stats.shares} | reject: {stats.rejects}\n"
+            )
+            sys.stdout.flush()
 
-        print("\n=== Résultat final ===")
-        print(f"Nombre de share : {self.stats.shares}")
-        print(f"Nombre de reject: {self.stats.rejects}")
+        sys.stdout.write(
+            "\n=== Résultat final ===\n"
+            f"Nombre de share : {self.stats.shares}\n"
+            f"Nombre de reject: {self.stats.rejects}\n"
+        )
+        sys.stdout.flush()
+        self._log_fp.flush()
+
+
+# (env variable, constructor argument, converter, default)
+_ENV_SPEC = [
+    ("ADMOB_APP_ID", "app_id", str, ""),
+    ("ADMOB_REWARDED_AD_UNIT_ID", "ad_unit_id", str, ""),
+    ("GOOGLE_API_KEY", "api_key", str, ""),
+    ("RUNS", "runs", int, "5"),
+    ("WATCH_SECONDS", "watch_seconds", int, "3"),
+    ("REWARDED_VIDEO_URL", "video_url", str, ""),
+    ("EVENTS_LOG_FILE", "log_file", str, "events_log.jsonl"),
+]
+
+
+def _config_from_env(env=os.environ) -> dict:
+    return {arg: cast(env.get(name, default)) for name, arg, cast, default in _ENV_SPEC}
 
 
 if __name__ == "__main__":
-    app = RewardVideoTerminalApp(
-        app_id=os.getenv("ADMOB_APP_ID", ""),
-        ad_unit_id=os.getenv("ADMOB_REWARDED_AD_UNIT_ID", ""),
-        api_key=os.getenv("GOOGLE_API_KEY", ""),
-        runs=int(os.getenv("RUNS", "5")),
-        watch_seconds=int(os.getenv("WATCH_SECONDS", "3")),
-        video_url=os.getenv("REWARDED_VIDEO_URL", ""),
-        log_file=os.getenv("EVENTS_LOG_FILE", "events_log.jsonl"),
-    )
+    app = RewardVideoTerminalApp(**_config_from_env())
     app.run()